@@ -1,10 +1,47 @@
-class StatusCodeNot200(Exception):
+from http import HTTPStatus
+
+RETRYABLE = 'retryable'
+RATE_LIMITED = 'rate_limited'
+FATAL = 'fatal'
+
+
+class BotError(Exception):
+    """Базовая ошибка бота.
+
+    kind подсказывает, что делать с ошибкой: повторить попытку
+    (RETRYABLE), подождать снятия ограничения (RATE_LIMITED) или
+    прекратить частые попытки (FATAL), retry_delay - через сколько
+    секунд повторять.
+    """
+
+    kind = RETRYABLE
+    retry_delay = 10
+
+
+class StatusCodeNot200(BotError):
     """Ошибка, если ответ сервера не 200."""
 
     def __init__(self, status_code, url):
         self.status_code = status_code
         self.url = url
 
+    @property
+    def kind(self):
+        if self.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            return RATE_LIMITED
+        if (self.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+                or self.status_code == HTTPStatus.REQUEST_TIMEOUT):
+            return RETRYABLE
+        return FATAL
+
+    @property
+    def retry_delay(self):
+        if self.kind == RATE_LIMITED:
+            return 60
+        if self.kind == RETRYABLE:
+            return 10
+        return None
+
     def __str__(self):
         return (
             f'По адрессу {self.url} статус код: '
@@ -12,38 +49,111 @@ class StatusCodeNot200(Exception):
         )
 
 
-class UnknownHomeworkStatus(Exception):
+class UnknownHomeworkStatus(BotError):
     """Ошибка, если у домашней работы неизвестный статус проверки."""
-    pass
+
+    kind = FATAL
+    retry_delay = None
 
 
-class TelegramTokenError(Exception):
+class TelegramTokenError(BotError):
     """Ошибка значения переменной окружения TELEGRAM_TOKEN."""
 
+    kind = FATAL
+    retry_delay = None
+
     def __str__(self):
         return super().__str__() or 'Некорректный TELEGRAM_TOKEN!'
 
 
-class TelegramChatIdError(Exception):
+class TelegramChatIdError(BotError):
     """Ошибка значения переменной окружения TELEGRAM_CHAT_ID."""
 
+    kind = FATAL
+    retry_delay = None
+
     def __str__(self):
         return super().__str__() or 'Некорректный TELEGRAM_CHAT_ID!'
 
 
-class BotSendMessageError(Exception):
-    """Ошибка во время отправки сообщения в телеграм."""
+class BotSendMessageError(BotError):
+    """Ошибка во время отправки сообщения в телеграм.
+
+    Если телеграм ограничил частоту запросов (у ошибки есть
+    retry_after), повторять нужно не раньше, чем через retry_after секунд.
+    """
 
     def __init__(self, error):
         self.error = error
 
+    @property
+    def kind(self):
+        if getattr(self.error, 'retry_after', None):
+            return RATE_LIMITED
+        return getattr(self.error, 'kind', RETRYABLE)
+
+    @property
+    def retry_delay(self):
+        return (getattr(self.error, 'retry_after', None)
+                or getattr(self.error, 'retry_delay', 10))
+
     def __str__(self):
         return ('Во время отправки сообщения в телеграм произошел сбой! '
                 f'Ошибка: {self.error}')
 
 
-class ResponseObjNotJson(Exception):
+class ResponseObjNotJson(BotError):
     """Ошибка, если в ответе от сервиса пришел не json."""
 
+    retry_delay = 30
+
     def __str__(self):
         return super().__str__() or 'В ответе от сервиса пришел не json.'
+
+
+class RequestTimeout(BotError):
+    """Ошибка, если сервис не ответил за отведенное время."""
+
+    def __init__(self, endpoint, timeout=None):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def __str__(self):
+        if self.timeout is None:
+            return f'Превышено время ожидания ответа от {self.endpoint}!'
+        return (f'Превышено время ожидания ответа от {self.endpoint} '
+                f'({self.timeout:.1f} сек.)!')
+
+
+class CycleDeadlineExceeded(BotError):
+    """Ошибка, если бюджет времени цикла опроса исчерпан."""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+
+    def __str__(self):
+        return (f'Бюджет времени цикла опроса исчерпан, запрос к '
+                f'{self.endpoint} пропущен.')
+
+
+class ApiConnectionError(BotError):
+    """Ошибка соединения с сервисом."""
+
+    def __init__(self, endpoint, error):
+        self.endpoint = endpoint
+        self.error = error
+
+    def __str__(self):
+        return (f'Не удалось соединиться с {self.endpoint}! '
+                f'Ошибка: {self.error}')
+
+
+def error_kind(error):
+    """Класс ошибки, неизвестные ошибки считаются повторяемыми."""
+    return getattr(error, 'kind', RETRYABLE)
+
+
+def retry_delay(error, default):
+    """Рекомендуемая задержка перед повтором, default если ее нет."""
+    delay = getattr(error, 'retry_delay', None)
+    return default if delay is None else delay
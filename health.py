@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+from collections import Counter, deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Hashable, Optional
+
+
+class HealthState:
+    """Показатели работы бота для проверок живости и готовности."""
+
+    def __init__(self, max_stall: float, max_poll_age: float,
+                 failure_threshold: int = 3, lateness_window: int = 1024):
+        """Инициализация показателей."""
+        self.max_stall = max_stall
+        self.max_poll_age = max_poll_age
+        self.failure_threshold = failure_threshold
+        self.started = time.time()
+        self.heartbeat = time.time()
+        self.last_polls = {}
+        self.consecutive_failures = 0
+        self.last_telegram_success: Optional[float] = None
+        self._queues = {}
+        self.quarantined = Counter()
+        self.timeouts = Counter()
+        self.lateness = deque(maxlen=lateness_window)
+        self._lock = threading.Lock()
+
+    def beat(self) -> None:
+        """Отметка очередной итерации основного цикла."""
+        self.heartbeat = time.time()
+
+    def track_queue(self, name: str, depth: Callable[[], int]) -> None:
+        """Регистрация очереди, глубина которой попадает в сводку."""
+        with self._lock:
+            self._queues[name] = depth
+
+    def poll_started(self, lateness: float) -> None:
+        """Отметка запуска опроса с отклонением от расписания."""
+        with self._lock:
+            self.lateness.append(lateness)
+
+    def poll_succeeded(self, shard: Hashable) -> None:
+        """Отметка успешного опроса api."""
+        with self._lock:
+            self.last_polls[str(shard)] = time.time()
+
+    def cycle_succeeded(self) -> None:
+        """Отметка цикла, завершенного доставкой сообщений."""
+        with self._lock:
+            self.consecutive_failures = 0
+
+    def poll_failed(self) -> None:
+        """Отметка неудачного цикла: сбоя опроса api или отправки."""
+        with self._lock:
+            self.consecutive_failures += 1
+
+    def timed_out(self, endpoint: str) -> None:
+        """Отметка превышения времени ожидания ответа от endpoint."""
+        with self._lock:
+            self.timeouts[endpoint] += 1
+
+    def item_quarantined(self, error: Exception) -> None:
+        """Отметка пропущенной некорректной домашней работы."""
+        with self._lock:
+            self.quarantined[type(error).__name__] += 1
+
+    def telegram_succeeded(self) -> None:
+        """Отметка успешной отправки сообщения в телеграм."""
+        self.last_telegram_success = time.time()
+
+    @property
+    def circuit(self) -> str:
+        """Состояние цикла: open после failure_threshold сбоев подряд."""
+        if self.consecutive_failures >= self.failure_threshold:
+            return 'open'
+        return 'closed'
+
+    def is_alive(self) -> bool:
+        """Не завис ли основной цикл."""
+        return time.time() - self.heartbeat < self.max_stall
+
+    def is_ready(self) -> bool:
+        """Опрашивается ли api с ожидаемой частотой."""
+        now = time.time()
+        with self._lock:
+            last_polls = list(self.last_polls.values())
+        if not last_polls:
+            return now - self.started < self.max_poll_age
+        return all(now - last < self.max_poll_age for last in last_polls)
+
+    def report(self) -> dict:
+        """Сводка показателей для ответа health-эндпоинта."""
+        now = time.time()
+        with self._lock:
+            poll_ages = {
+                shard: round(now - last, 3)
+                for shard, last in self.last_polls.items()
+            }
+            quarantined = dict(self.quarantined)
+            timeouts = dict(self.timeouts)
+            lateness = list(self.lateness)
+            queues = dict(self._queues)
+        return {
+            'alive': self.is_alive(),
+            'ready': self.is_ready(),
+            'heartbeat_age': round(now - self.heartbeat, 3),
+            'last_poll_age': poll_ages,
+            'schedule_lateness': {
+                'max': round(max(lateness), 3) if lateness else None,
+                'avg': (round(sum(lateness) / len(lateness), 3)
+                        if lateness else None),
+            },
+            'queue_depth': {name: depth() for name, depth in queues.items()},
+            'circuit': self.circuit,
+            'consecutive_failures': self.consecutive_failures,
+            'quarantined': quarantined,
+            'timeouts': timeouts,
+            'last_telegram_success': self.last_telegram_success,
+        }
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов /health и /ready."""
+
+    state: HealthState = None
+
+    def do_GET(self):
+        """Ответ json-сводкой с кодом 200 или 503."""
+        if self.path == '/health':
+            ok = self.state.is_alive()
+        elif self.path == '/ready':
+            ok = self.state.is_ready()
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = json.dumps(self.state.report()).encode()
+        status = HTTPStatus.OK if ok else HTTPStatus.SERVICE_UNAVAILABLE
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Запросы проверок не пишутся в лог."""
+
+
+def start_health_server(state: HealthState, port: int,
+                        host: str = '') -> ThreadingHTTPServer:
+    """Запуск health-эндпоинта в отдельном потоке."""
+    handler = type('BoundHealthHandler', (HealthHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(
+        target=server.serve_forever, name='health', daemon=True
+    )
+    thread.start()
+    return server
@@ -1,22 +1,50 @@
 from json import JSONDecodeError
+import argparse
+import functools
 import logging
 import os
+import queue
+import signal
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
-from typing import Union
+from typing import Optional, Tuple, Union
+
+try:
+    import resource
+except ImportError:
+    resource = None
 
 import requests
 import telegram
 from dotenv import load_dotenv
-from telegram.error import BadRequest, Unauthorized
-
-from exceptions import (ResponseObjNotJson,
+from telegram.error import BadRequest, TimedOut, Unauthorized
+from telegram.utils.request import Request
+
+from exceptions import (FATAL,
+                        RATE_LIMITED,
+                        ApiConnectionError,
+                        RequestTimeout,
+                        ResponseObjNotJson,
                         StatusCodeNot200,
                         TelegramChatIdError,
                         TelegramTokenError,
                         UnknownHomeworkStatus,
-                        BotSendMessageError)
+                        BotSendMessageError,
+                        error_kind,
+                        retry_delay)
+from health import HealthState, start_health_server
+from notifications import (PRIORITY_ERROR,
+                           PRIORITY_STARTUP,
+                           PRIORITY_STATUS,
+                           OutboundQueue,
+                           build_digests)
+from pipeline import Pipeline
+from recorder import Recorder
+from scheduler import TimingWheel
+from state import TenantStateStore
+from timeouts import Deadline, call_with_timeout, current_deadline, stop_at
 
 load_dotenv()
 
@@ -25,8 +53,36 @@ TELEGRAM_TOKEN: str = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID: str = os.getenv('TELEGRAM_CHAT_ID')
 
 RETRY_TIME: int = 600
+FATAL_RETRY_TIME: int = 6 * RETRY_TIME
+ALERT_AFTER_FAILURES: int = 3
+SHUTDOWN_TIMEOUT: int = int(os.getenv('SHUTDOWN_TIMEOUT', 10))
+SHUTDOWN_CHECK_INTERVAL: float = 0.1
+STATE_DIR: str = os.getenv('STATE_DIR', 'state')
+STATE_MAX_BYTES: int = int(os.getenv('STATE_MAX_BYTES', 10 * 1024 * 1024))
+SCHEDULER_TICK: float = float(os.getenv('SCHEDULER_TICK', 1))
+POLL_BATCH_SIZE: int = int(os.getenv('POLL_BATCH_SIZE', 100))
+RECORD_FILE: str = os.getenv('RECORD_FILE')
+HEALTH_PORT: str = os.getenv('HEALTH_PORT')
+QUARANTINE_SIZE: int = 20
+FETCH_WORKERS: int = int(os.getenv('FETCH_WORKERS', 0))
+SEND_WORKERS: int = int(os.getenv('SEND_WORKERS', 1))
+PIPELINE_QUEUE_SIZE: int = int(os.getenv('PIPELINE_QUEUE_SIZE', 100))
+OUTBOX_MAX_BACKLOG: int = int(os.getenv('OUTBOX_MAX_BACKLOG', 50))
+OUTBOX_TTL: dict = {
+    PRIORITY_ERROR: 6 * RETRY_TIME,
+    PRIORITY_STARTUP: RETRY_TIME,
+}
 ENDPOINT: str = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS: dict = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+TELEGRAM_ENDPOINT: str = 'https://api.telegram.org'
+
+API_CONNECT_TIMEOUT: float = 5
+API_READ_TIMEOUT: float = 30
+API_TOTAL_TIMEOUT: float = 60
+TELEGRAM_CONNECT_TIMEOUT: float = 5
+TELEGRAM_READ_TIMEOUT: float = 10
+TELEGRAM_TOTAL_TIMEOUT: float = 20
+POLL_BUDGET: float = 120
 
 HOMEWORK_STATUSES: dict = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -51,36 +107,158 @@ def get_custom_logger() -> logging.Logger:
 logger = get_custom_logger()
 
 
+class GracefulShutdown:
+    """Состояние плавной остановки бота по сигналу.
+
+    Обработчик сигнала только присваивает значения: блокировки, в том
+    числе внутри threading.Event и logging, в нем могут взаимно
+    заблокироваться с прерванным основным потоком. Ожидание проверяет
+    флаг короткими интервалами.
+    """
+
+    def __init__(self, timeout: int = SHUTDOWN_TIMEOUT):
+        """Инициализация состояния остановки."""
+        self.timeout = timeout
+        self.deadline = None
+        self.signum = None
+        self._requested = False
+
+    def request(self, signum=None, frame=None) -> None:
+        """Запрос остановки, используется как обработчик сигналов."""
+        if not self._requested:
+            self.signum = signum
+            self.deadline = time.monotonic() + self.timeout
+            self._requested = True
+
+    def is_set(self) -> bool:
+        """Была ли запрошена остановка."""
+        return self._requested
+
+    def wait(self, timeout: float) -> bool:
+        """Прерываемое ожидание, возвращает True при запросе остановки."""
+        end = time.monotonic() + timeout
+        while not self._requested:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, SHUTDOWN_CHECK_INTERVAL))
+        return True
+
+    def remaining(self) -> Optional[float]:
+        """Оставшееся до конца отправки время, None без остановки."""
+        if not self.is_set():
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def drain_expired(self) -> bool:
+        """Истекло ли время на отправку оставшихся сообщений."""
+        return self.is_set() and time.monotonic() >= self.deadline
+
+
+shutdown = GracefulShutdown()
+recorder = Recorder(RECORD_FILE)
+tenant_states = TenantStateStore(STATE_DIR, STATE_MAX_BYTES)
+outbox = OutboundQueue(OUTBOX_MAX_BACKLOG, OUTBOX_TTL)
+retries = queue.Queue()
+health = HealthState(max_stall=RETRY_TIME, max_poll_age=2 * RETRY_TIME)
+health.track_queue('outbox', lambda: len(outbox))
+tenant_states.track('outbox', lambda: len(outbox))
+tenant_states.track('last_polls', lambda: len(health.last_polls))
+
+
+def handle_shutdown(signum, frame) -> None:
+    """Обработчик сигналов остановки.
+
+    Сетевые вызовы, в том числе уже идущие, ограничиваются временем,
+    отведенным на остановку.
+    """
+    shutdown.request(signum, frame)
+    stop_at(shutdown.deadline)
+
+
 def send_message(bot, message: str) -> None:
     """Отправка сообщения ботом."""
+    started = time.monotonic()
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
-    except Unauthorized:
-        raise TelegramTokenError()
-    except BadRequest:
-        raise TelegramChatIdError()
+        call_with_timeout(
+            TELEGRAM_ENDPOINT, TELEGRAM_TOTAL_TIMEOUT, bot.send_message,
+            chat_id=TELEGRAM_CHAT_ID, text=message,
+            timeout=TELEGRAM_READ_TIMEOUT,
+        )
     except Exception as error:
-        raise BotSendMessageError(error)
+        recorder.record('telegram', started, chat_id=TELEGRAM_CHAT_ID,
+                        text=message, error=type(error).__name__,
+                        message=str(error),
+                        retry_after=getattr(error, 'retry_after', None))
+        raise telegram_send_error(error) from error
+    recorder.record('telegram', started,
+                    chat_id=TELEGRAM_CHAT_ID, text=message)
+    health.telegram_succeeded()
     message = message[:40] + (message[40:] and '...')
     logger.info(f'Сообщение ({message}) успешно отправлено в телеграмм.')
 
 
+def telegram_send_error(error: Exception) -> Exception:
+    """Ошибка бота, соответствующая сбою отправки в телеграм."""
+    if isinstance(error, Unauthorized):
+        return TelegramTokenError()
+    if isinstance(error, BadRequest):
+        return TelegramChatIdError()
+    if isinstance(error, (TimedOut, RequestTimeout)):
+        health.timed_out(TELEGRAM_ENDPOINT)
+    return BotSendMessageError(error)
+
+
+def api_request_error(error: Exception) -> Exception:
+    """Ошибка бота, соответствующая сбою запроса к api."""
+    if isinstance(error, RequestTimeout):
+        health.timed_out(ENDPOINT)
+        return error
+    if isinstance(error, requests.ConnectTimeout):
+        health.timed_out(ENDPOINT)
+        return RequestTimeout(ENDPOINT, API_CONNECT_TIMEOUT)
+    if isinstance(error, requests.Timeout):
+        health.timed_out(ENDPOINT)
+        return RequestTimeout(ENDPOINT, API_READ_TIMEOUT)
+    if isinstance(error, requests.ConnectionError):
+        return ApiConnectionError(ENDPOINT, error)
+    return error
+
+
 def get_api_answer(current_timestamp: int) -> Union[dict, list]:
     """Запрос к API сервиса Практикум-Домашка."""
     timestamp = current_timestamp or int(time.time())
     params = {'from_date': timestamp}
 
     logger.debug(f'Делаем запрос к api по адрессу: {ENDPOINT}')
-    response = requests.get(ENDPOINT, headers=HEADERS, params=params)
+    started = time.monotonic()
+    try:
+        response = call_with_timeout(
+            ENDPOINT, API_TOTAL_TIMEOUT, requests.get,
+            ENDPOINT, headers=HEADERS, params=params,
+            timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT),
+        )
+    except Exception as error:
+        failure = api_request_error(error)
+        recorder.record('api', started, from_date=timestamp,
+                        error=type(failure).__name__, message=str(failure))
+        if failure is error:
+            raise
+        raise failure from error
     logger.debug('Получили ответ от сервера.')
 
-    if response.status_code != HTTPStatus.OK:
-        raise StatusCodeNot200(response.status_code, ENDPOINT)
+    data = None
     try:
-        response = response.json()
-    except JSONDecodeError:
-        raise ResponseObjNotJson()
-    return response
+        if response.status_code != HTTPStatus.OK:
+            raise StatusCodeNot200(response.status_code, ENDPOINT)
+        try:
+            data = response.json()
+        except JSONDecodeError:
+            raise ResponseObjNotJson()
+    finally:
+        recorder.record('api', started, from_date=timestamp,
+                        status_code=response.status_code, json=data)
+    return data
 
 
 def check_response(response: Union[dict, list]) -> list:
@@ -132,45 +310,380 @@ def parse_status(homework: dict) -> str:
     return message
 
 
+def quarantine(homework, error: Exception) -> None:
+    """Учет некорректной домашней работы, не мешающей обработке остальных."""
+    logger.error(f'Домашняя работа пропущена ({error}): {homework!r}')
+    health.item_quarantined(error)
+    records = tenant_states.get(TELEGRAM_CHAT_ID).get('quarantine', [])
+    records = records[-(QUARANTINE_SIZE - 1):] + [{
+        'error': f'{type(error).__name__}: {error}',
+        'homework': repr(homework),
+    }]
+    tenant_states.update(TELEGRAM_CHAT_ID, quarantine=records)
+
+
+def parse_statuses(homeworks: list) -> list:
+    """Получение пар (домашняя работа, сообщение) для корректных работ."""
+    parsed = []
+    for homework in homeworks:
+        try:
+            parsed.append((homework, parse_status(homework)))
+        except (KeyError, TypeError, UnknownHomeworkStatus) as error:
+            quarantine(homework, error)
+    return parsed
+
+
+def send_statuses(bot, homeworks: list) -> bool:
+    """Отправка сообщений об изменении статусов домашних работ.
+
+    Все изменения за цикл объединяются в дайджесты, о статусах, о которых
+    уже сообщали, повторно не сообщается. Дайджесты отправляются через
+    очередь раньше остальных сообщений, а недоставленные не копятся в ней:
+    метка опроса не сдвигается, и они будут получены из api снова.
+    Дайджесты помечаются своим пакетом, чтобы параллельные отправки не
+    удаляли и не отправляли чужие.
+    Возвращает False, если не все дайджесты доставлены.
+    """
+    statuses = dict(tenant_states.get(TELEGRAM_CHAT_ID).get('homeworks', {}))
+    changes = []
+    for homework, message in parse_statuses(homeworks):
+        name, status = homework['homework_name'], homework['status']
+        if statuses.get(name) == status:
+            logger.debug('Статус работы уже был отправлен.')
+            continue
+        changes.append((name, status, message))
+
+    batch = object()
+    for digest, done in build_digests([message for _, _, message in changes]):
+        delivered, changes = changes[:done], changes[done:]
+        outbox.put(digest, PRIORITY_STATUS, on_sent=functools.partial(
+            mark_sent, statuses, delivered
+        ), batch=batch)
+    try:
+        flushed = flush_outbox(bot, batch)
+    finally:
+        dropped = outbox.drop(PRIORITY_STATUS, batch)
+        tenant_states.update(TELEGRAM_CHAT_ID, homeworks=statuses)
+    flush_pending(bot)
+    return flushed and not dropped
+
+
+def mark_sent(statuses: dict, delivered: list) -> None:
+    """Отметка статусов, сообщения о которых доставлены."""
+    for name, status, _ in delivered:
+        statuses[name] = status
+
+
+def sending_stopped() -> bool:
+    """Нужно ли прервать отправку сообщений в этом цикле."""
+    if shutdown.drain_expired():
+        logger.warning('Не все сообщения отправлены до остановки бота.')
+        return True
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired():
+        logger.warning('Бюджет времени цикла исчерпан, оставшиеся '
+                       'сообщения будут отправлены в следующем.')
+        return True
+    return False
+
+
+def flush_outbox(bot, batch: Optional[object] = None) -> bool:
+    """Отправка сообщений из очереди в порядке приоритета.
+
+    С batch отправляются только сообщения этого пакета, без него - общие.
+    Возвращает False, если отправку прервала остановка бота или
+    исчерпание бюджета времени цикла.
+    """
+    try:
+        return outbox.flush(functools.partial(send_message, bot),
+                            stop=sending_stopped, batch=batch)
+    finally:
+        if outbox.shed:
+            logger.warning(f'Отброшено сообщений при перегрузке очереди: '
+                           f'{outbox.shed}.')
+
+
+def flush_pending(bot) -> None:
+    """Отправка остальных сообщений очереди без влияния на опрос.
+
+    Сбой отправки только пишется в лог, сообщение остается в очереди
+    до следующей попытки или истечения срока.
+    """
+    try:
+        flush_outbox(bot)
+    except Exception as error:
+        logger.error(error)
+
+
+def load_cursor() -> int:
+    """Загрузка временной метки, с которой продолжать опрос api."""
+    current_timestamp = tenant_states.get(TELEGRAM_CHAT_ID).get('current_date')
+    return current_timestamp or int(time.time()) - RETRY_TIME
+
+
+def save_cursor(current_timestamp: int) -> None:
+    """Сохранение временной метки последнего успешного опроса api."""
+    tenant_states.update(TELEGRAM_CHAT_ID, current_date=current_timestamp)
+    tenant_states.persist(TELEGRAM_CHAT_ID)
+
+
+def log_memory_report(signum=None, frame=None) -> None:
+    """Вывод в лог отчета о памяти, используется как обработчик сигнала."""
+    logger.info(f'Отчет о памяти: {tenant_states.memory_report()}')
+
+
+def fetch_homeworks(tenant) -> Tuple[Deadline, int, list]:
+    """Стадия получения: запрос к api и проверка ответа.
+
+    Бюджет времени цикла отсчитывается от начала этой стадии.
+    """
+    deadline = Deadline(POLL_BUDGET)
+    with deadline:
+        response = get_api_answer(load_cursor())
+    homeworks = check_response(response)
+    health.poll_succeeded(tenant)
+    return deadline, response.get('current_date'), homeworks
+
+
+def deliver(bot, tenant, fetched: Tuple[Deadline, int, list]) -> None:
+    """Стадия отправки: сообщения о статусах и сдвиг метки опроса."""
+    deadline, current_date, homeworks = fetched
+    with deadline:
+        if send_statuses(bot, homeworks):
+            save_cursor(current_date)
+            health.cycle_succeeded()
+
+
+def deliver_safely(bot, tenant, fetched: Tuple[Deadline, int, list],
+                   alert_after: int = ALERT_AFTER_FAILURES) -> bool:
+    """Стадия отправки с учетом сбоя.
+
+    При сбое полученные данные сохраняются для повтора отправки, чтобы
+    не запрашивать api заново. Возвращает False, если отправка не удалась.
+    """
+    try:
+        deliver(bot, tenant, fetched)
+    except Exception as error:
+        report_error(bot, tenant, error, alert_after, pending=fetched[1:])
+        return False
+    return True
+
+
+def next_retry(error: Exception, failures: int) -> float:
+    """Задержка перед повтором опроса в зависимости от класса ошибки.
+
+    Повторяемые ошибки повторяются через секунды с экспоненциальным
+    ростом задержки до RETRY_TIME, фатальные - не чаще FATAL_RETRY_TIME.
+    """
+    kind = error_kind(error)
+    if kind == FATAL:
+        return FATAL_RETRY_TIME
+    delay = retry_delay(error, RETRY_TIME)
+    if kind == RATE_LIMITED:
+        return delay
+    return min(delay * 2 ** (failures - 1), RETRY_TIME)
+
+
+def report_error(bot, tenant, error: Exception,
+                 alert_after: int = ALERT_AFTER_FAILURES,
+                 pending: Optional[Tuple[int, list]] = None) -> None:
+    """Учет сбоя цикла: планирование повтора и оповещение в телеграм.
+
+    О фатальных ошибках оповещаем сразу, об остальных - после alert_after
+    сбоев подряд, до этого только пишем в лог. Если передан pending
+    (current_date и домашние работы), повторяется только их отправка.
+    """
+    health.poll_failed()
+    failures = health.consecutive_failures
+    kind = error_kind(error)
+    delay = next_retry(error, failures)
+    retries.put((tenant, delay, pending))
+    level = {FATAL: logging.CRITICAL, RATE_LIMITED: logging.WARNING}
+    logger.log(level.get(kind, logging.ERROR),
+               f'{error} Повтор через {delay:.0f} сек.')
+    if kind != FATAL and failures < alert_after:
+        return
+    outbox.put(f'Сбой программы: {error}', PRIORITY_ERROR)
+    flush_pending(bot)
+
+
+def poll(bot, tenant, alert_after: int = ALERT_AFTER_FAILURES) -> bool:
+    """Один последовательный опрос api с отправкой сообщений.
+
+    Возвращает False, если опрос завершился сбоем.
+    """
+    try:
+        fetched = fetch_homeworks(tenant)
+    except Exception as error:
+        report_error(bot, tenant, error, alert_after)
+        return False
+    return deliver_safely(bot, tenant, fetched, alert_after)
+
+
+def start_pipeline(bot) -> Optional[Pipeline]:
+    """Запуск конвейера опросов, если заданы потоки стадии получения."""
+    if not FETCH_WORKERS:
+        return None
+    logger.info(f'Конвейерный режим: {FETCH_WORKERS} потоков получения, '
+                f'{SEND_WORKERS} потоков отправки.')
+    pipeline = Pipeline(
+        fetch_homeworks,
+        functools.partial(deliver_safely, bot),
+        functools.partial(report_error, bot),
+        FETCH_WORKERS, SEND_WORKERS, PIPELINE_QUEUE_SIZE,
+    )
+    health.track_queue('pipeline', lambda: pipeline.depth)
+    return pipeline
+
+
+def peak_memory() -> str:
+    """Пиковое потребление памяти процессом."""
+    if resource is None:
+        return 'неизвестно'
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        max_rss //= 1024
+    return f'{max_rss / 1024:.1f} Мб'
+
+
+def run_once(bot) -> bool:
+    """Один проход опроса всех тенантов для запуска из cron.
+
+    Повтора внутри процесса нет, поэтому об ошибке оповещаем сразу.
+    Возвращает False, если опрос хотя бы одного тенанта не удался.
+    """
+    started = time.monotonic()
+    tenants = [TELEGRAM_CHAT_ID]
+    with ThreadPoolExecutor(max_workers=max(FETCH_WORKERS, 1)) as executor:
+        results = list(executor.map(
+            functools.partial(poll, bot, alert_after=1), tenants
+        ))
+    tenant_states.flush()
+    while not retries.empty():
+        retries.get_nowait()
+    failed = results.count(False)
+    logger.info(f'Разовый опрос завершен за '
+                f'{time.monotonic() - started:.3f} сек., '
+                f'пиковая память: {peak_memory()}.')
+    if failed:
+        logger.error(f'Опрос не удался для {failed} из {len(tenants)} '
+                     f'тенантов.')
+    return not failed
+
+
 def check_tokens() -> bool:
     """Проверка корректного импорта переменных окружения."""
     logger.debug('Проверяется импорт переменных окружения.')
     return all((PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID))
 
 
+def schedule_retries(wheel: TimingWheel) -> None:
+    """Перенос опросов, завершившихся сбоем, на время повтора."""
+    while True:
+        try:
+            tenant, delay, pending = retries.get_nowait()
+        except queue.Empty:
+            return
+        if pending is not None or tenant_states.get(tenant).get('pending'):
+            tenant_states.update(tenant, pending=pending)
+        wheel.schedule(tenant, time.monotonic() + delay)
+
+
+def dispatch(bot, pipeline: Optional[Pipeline], tenant) -> None:
+    """Запуск цикла тенанта: повтор отправки или новый опрос api."""
+    pending = tenant_states.get(tenant).get('pending')
+    if pending is not None:
+        tenant_states.update(tenant, pending=None)
+        fetched = (Deadline(POLL_BUDGET), *pending)
+        if pipeline:
+            pipeline.submit_send(tenant, fetched)
+        else:
+            deliver_safely(bot, tenant, fetched)
+    elif pipeline:
+        pipeline.submit(tenant)
+    else:
+        poll(bot, tenant)
+
+
+def run_due(bot, pipeline: Optional[Pipeline], wheel: TimingWheel) -> None:
+    """Запуск всех наступивших опросов пачками по POLL_BATCH_SIZE.
+
+    Темп задает очередь конвейера: submit блокируется при ее заполнении.
+    Между пачками обновляется пульс и планируются повторы.
+    """
+    while not shutdown.is_set():
+        health.beat()
+        schedule_retries(wheel)
+        due = wheel.pop_due(time.monotonic(), POLL_BATCH_SIZE)
+        if not due:
+            return
+        for tenant, lateness in due:
+            health.poll_started(lateness)
+            logger.debug(f'Опрос {tenant} запущен, отклонение от '
+                         f'расписания: {lateness:.3f} сек.')
+            dispatch(bot, pipeline, tenant)
+            wheel.schedule(tenant, time.monotonic() + RETRY_TIME)
+
+
+def run_polls(bot) -> None:
+    """Опрос api по расписанию до запроса остановки."""
+    save_cursor(load_cursor())
+    pipeline = start_pipeline(bot)
+    wheel = TimingWheel(tick=SCHEDULER_TICK)
+    tenant_states.track('wheel', wheel.__len__)
+    wheel.schedule(TELEGRAM_CHAT_ID, time.monotonic())
+    while not shutdown.is_set():
+        run_due(bot, pipeline, wheel)
+        schedule_retries(wheel)
+        shutdown.wait(wheel.tick)
+
+    logger.info(f'Получен сигнал остановки ({shutdown.signum}).')
+    if pipeline and not pipeline.close(shutdown.remaining()):
+        logger.warning('Конвейер не завершил работу до остановки бота.')
+
+
 def main():
     """Основная логика работы бота."""
+    parser = argparse.ArgumentParser(description='КакДомашка-бот.')
+    parser.add_argument('--once', action='store_true',
+                        help='один проход опроса и выход (для cron)')
+    args = parser.parse_args()
     if not check_tokens():
         logger.critical('Проверьте наличие переменных окружения!')
         sys.exit()
     logger.debug('Переменные окружения успешно импортированны.')
 
     try:
-        bot = telegram.Bot(token=TELEGRAM_TOKEN)
+        bot = telegram.Bot(token=TELEGRAM_TOKEN, request=Request(
+            con_pool_size=SEND_WORKERS + 4,
+            connect_timeout=TELEGRAM_CONNECT_TIMEOUT,
+            read_timeout=TELEGRAM_READ_TIMEOUT,
+        ))
         logger.info('Осуществлен запуск бота.')
-        send_message(bot, 'Бот запущен!')
+        if not args.once:
+            outbox.put('Бот запущен!', PRIORITY_STARTUP)
+            flush_outbox(bot)
     except BotSendMessageError as error:
         logger.error(error)
     except Exception as error:
         logger.critical(error)
         sys.exit()
 
-    current_timestamp = int(time.time()) - RETRY_TIME
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            homeworks = check_response(response)
-            for homework in homeworks:
-                message = parse_status(homework)
-                send_message(bot, message)
-
-            current_timestamp = response.get('current_date')
-        except Exception as error:
-            message = f'Сбой программы: {error}'
-            logger.error(error)
-            send_message(bot, message)
-        finally:
-            time.sleep(RETRY_TIME)
+    if args.once:
+        sys.exit(0 if run_once(bot) else 1)
+
+    signal.signal(signal.SIGTERM, handle_shutdown)
+    signal.signal(signal.SIGINT, handle_shutdown)
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, log_memory_report)
+
+    if HEALTH_PORT:
+        start_health_server(health, int(HEALTH_PORT))
+        logger.info(f'Health-эндпоинт запущен на порту {HEALTH_PORT}.')
+
+    run_polls(bot)
+    tenant_states.flush()
+    logger.info('Бот остановлен.')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,221 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+TELEGRAM_MESSAGE_LIMIT: int = 4096
+DIGEST_SEPARATOR: str = '\n\n'
+
+
+def telegram_length(text: str) -> int:
+    """Длина текста так, как ее считает телеграм: в единицах UTF-16."""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _fit(text: str, limit: int) -> int:
+    units = 0
+    for index, char in enumerate(text):
+        units += 2 if ord(char) > 0xFFFF else 1
+        if units > limit:
+            return index
+    return len(text)
+
+
+def split_message(message: str,
+                  limit: int = TELEGRAM_MESSAGE_LIMIT) -> List[str]:
+    """Разбиение сообщения на части не длиннее limit по счету телеграма.
+
+    Сообщение по возможности делится по переводу строки, затем по
+    пробелу, и только слово длиннее limit режется посередине.
+    """
+    parts = []
+    while telegram_length(message) > limit:
+        cut = _fit(message, limit)
+        boundary = message.rfind('\n', 0, cut + 1)
+        if boundary <= 0:
+            boundary = message.rfind(' ', 0, cut + 1)
+        if boundary > 0:
+            parts.append(message[:boundary])
+            message = message[boundary + 1:]
+        else:
+            parts.append(message[:max(cut, 1)])
+            message = message[max(cut, 1):]
+    if message:
+        parts.append(message)
+    return parts
+
+
+def build_digests(
+    messages: List[str], limit: int = TELEGRAM_MESSAGE_LIMIT
+) -> List[Tuple[str, int]]:
+    """Объединение сообщений в дайджесты не длиннее limit по счету телеграма.
+
+    Возвращает пары (текст дайджеста, сколько сообщений завершает этот
+    дайджест), чтобы после частичной отправки было видно, какие
+    сообщения уже доставлены. Слишком длинное сообщение делится на
+    несколько дайджестов.
+    """
+    digests = []
+    parts, length, done = [], 0, 0
+    for message in messages:
+        for part in split_message(message, limit):
+            extra = telegram_length(part) + (
+                telegram_length(DIGEST_SEPARATOR) if parts else 0
+            )
+            if parts and length + extra > limit:
+                digests.append((DIGEST_SEPARATOR.join(parts), done))
+                parts, length, done = [], 0, 0
+                extra = telegram_length(part)
+            parts.append(part)
+            length += extra
+        done += 1
+    if parts:
+        digests.append((DIGEST_SEPARATOR.join(parts), done))
+    return digests
+
+
+PRIORITY_STATUS: int = 0
+PRIORITY_ERROR: int = 1
+PRIORITY_STARTUP: int = 2
+
+
+class OutboundQueue:
+    """Очередь исходящих сообщений с приоритетами и сбросом нагрузки.
+
+    Сообщения отправляются в порядке приоритета (меньше - важнее).
+    Одинаковые сообщения об ошибках и запуске схлопываются в одно со
+    счетчиком повторов, при очереди длиннее max_backlog новые такие
+    сообщения отбрасываются. Сообщения старше ttl своего приоритета
+    не отправляются. Сообщения с меткой batch отправляет и удаляет
+    только тот, кто их поставил, остальные - любой вызов flush без метки.
+    """
+
+    def __init__(self, max_backlog: int = 50,
+                 ttl: Optional[Dict[int, float]] = None):
+        """Инициализация пустой очереди."""
+        self.max_backlog = max_backlog
+        self.ttl = ttl or {}
+        self.shed = 0
+        self._heap = []
+        self._collapsible = {}
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Количество ожидающих отправки сообщений."""
+        return len(self._heap)
+
+    def put(self, text: str, priority: int,
+            on_sent: Optional[Callable[[], None]] = None,
+            batch: Optional[Hashable] = None) -> bool:
+        """Постановка сообщения в очередь, False если оно отброшено."""
+        with self._lock:
+            self._purge()
+            if priority != PRIORITY_STATUS and batch is None:
+                entry = self._collapsible.get(text)
+                if entry is not None:
+                    entry[4] += 1
+                    return True
+                if len(self._heap) >= self.max_backlog:
+                    self.shed += 1
+                    return False
+            ttl = self.ttl.get(priority)
+            expires = None if ttl is None else time.monotonic() + ttl
+            entry = [priority, next(self._seq), text, expires, 1, on_sent,
+                     batch]
+            heapq.heappush(self._heap, entry)
+            if priority != PRIORITY_STATUS and batch is None:
+                self._collapsible[text] = entry
+            return True
+
+    def _purge(self) -> None:
+        now = time.monotonic()
+        alive = [entry for entry in self._heap
+                 if entry[3] is None or entry[3] > now]
+        if len(alive) != len(self._heap):
+            self._heap = alive
+            heapq.heapify(self._heap)
+            self._collapsible = {
+                entry[2]: entry for entry in alive
+                if entry[0] != PRIORITY_STATUS and entry[6] is None
+            }
+
+    def drop(self, priority: int, batch: Optional[Hashable] = None) -> int:
+        """Удаление сообщений приоритета с меткой batch.
+
+        Возвращает количество удаленных сообщений.
+        """
+        with self._lock:
+            before = len(self._heap)
+            self._heap = [entry for entry in self._heap
+                          if entry[0] != priority or entry[6] is not batch]
+            heapq.heapify(self._heap)
+            return before - len(self._heap)
+
+    def _next(self, max_priority: Optional[int],
+              batch: Optional[Hashable]) -> Optional[list]:
+        own = [entry for entry in self._heap if entry[6] is batch and (
+            max_priority is None or entry[0] <= max_priority
+        )]
+        if not own:
+            return None
+        entry = min(own)
+        self._heap.remove(entry)
+        heapq.heapify(self._heap)
+        return entry
+
+    def _pop(self, max_priority: Optional[int],
+             batch: Optional[Hashable]) -> Optional[list]:
+        now = time.monotonic()
+        while True:
+            entry = self._next(max_priority, batch)
+            if entry is None:
+                return None
+            if self._collapsible.get(entry[2]) is entry:
+                del self._collapsible[entry[2]]
+            if entry[3] is None or entry[3] > now:
+                return entry
+
+    def _requeue(self, entry: list) -> None:
+        if entry[0] != PRIORITY_STATUS and entry[6] is None:
+            newer = self._collapsible.get(entry[2])
+            if newer is not None:
+                newer[4] += entry[4]
+                return
+            self._collapsible[entry[2]] = entry
+        heapq.heappush(self._heap, entry)
+
+    def flush(self, send: Callable[[str], None],
+              stop: Callable[[], bool] = lambda: False,
+              max_priority: Optional[int] = None,
+              batch: Optional[Hashable] = None) -> bool:
+        """Отправка сообщений через send, пока очередь не опустеет.
+
+        Отправляются только сообщения с меткой batch, с max_priority - еще
+        и только с приоритетом не ниже заданного. Блокировка очереди не
+        удерживается во время send, поэтому несколько потоков отправляют
+        сообщения параллельно.
+        Сообщение, при отправке которого произошла ошибка, возвращается в
+        очередь, а ошибка пробрасывается дальше. Возвращает False, если
+        отправку прервал stop.
+        """
+        while True:
+            with self._lock:
+                entry = self._pop(max_priority, batch)
+                if entry is not None and stop():
+                    self._requeue(entry)
+                    return False
+            if entry is None:
+                return True
+            _, _, text, _, count, on_sent, _ = entry
+            if count > 1:
+                text = f'{text} (повторов: {count})'
+            try:
+                send(text)
+            except Exception:
+                with self._lock:
+                    self._requeue(entry)
+                raise
+            if on_sent is not None:
+                on_sent()
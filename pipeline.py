@@ -0,0 +1,102 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+_STOP = object()
+
+
+class Pipeline:
+    """Конвейер опросов из стадий получения и отправки.
+
+    Стадии связаны ограниченными очередями и работают в своих пулах
+    потоков, поэтому получение данных для следующего тенанта идет
+    параллельно с отправкой сообщений предыдущему. Заполненная очередь
+    блокирует предыдущую стадию.
+    """
+
+    def __init__(self, fetch: Callable[[Hashable], Any],
+                 send: Callable[[Hashable, Any], None],
+                 on_error: Callable[[Hashable, Exception], None],
+                 fetch_workers: int = 1, send_workers: int = 1,
+                 queue_size: int = 100):
+        """Инициализация и запуск потоков стадий."""
+        self.fetch = fetch
+        self.send = send
+        self.on_error = on_error
+        self.fetch_queue = queue.Queue(maxsize=queue_size)
+        self.send_queue = queue.Queue(maxsize=queue_size)
+        self._fetchers = self._start(self._fetch_worker, fetch_workers)
+        self._senders = self._start(self._send_worker, send_workers)
+
+    def _start(self, target: Callable, count: int) -> list:
+        threads = [
+            threading.Thread(target=target, daemon=True,
+                             name=f'{target.__name__}-{number}')
+            for number in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _fetch_worker(self) -> None:
+        while True:
+            tenant = self.fetch_queue.get()
+            try:
+                if tenant is _STOP:
+                    return
+                self.send_queue.put((tenant, self.fetch(tenant)))
+            except Exception as error:
+                self.on_error(tenant, error)
+            finally:
+                self.fetch_queue.task_done()
+
+    def _send_worker(self) -> None:
+        while True:
+            item = self.send_queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self.send(*item)
+            except Exception as error:
+                self.on_error(item[0], error)
+            finally:
+                self.send_queue.task_done()
+
+    def submit(self, tenant: Hashable) -> None:
+        """Постановка опроса тенанта в очередь, блокируется при заполнении."""
+        self.fetch_queue.put(tenant)
+
+    def submit_send(self, tenant: Hashable, result: Any) -> None:
+        """Постановка уже полученных данных сразу в стадию отправки."""
+        self.send_queue.put((tenant, result))
+
+    @property
+    def depth(self) -> int:
+        """Количество опросов, ожидающих в очередях."""
+        return self.fetch_queue.qsize() + self.send_queue.qsize()
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Завершение работы после обработки уже поставленных опросов.
+
+        Возвращает False, если потоки не завершились за timeout секунд.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for stage_queue, threads in ((self.fetch_queue, self._fetchers),
+                                     (self.send_queue, self._senders)):
+            try:
+                for _ in threads:
+                    stage_queue.put(_STOP, timeout=_remaining(deadline))
+            except queue.Full:
+                return False
+            for thread in threads:
+                thread.join(_remaining(deadline))
+        return not any(
+            thread.is_alive() for thread in self._fetchers + self._senders
+        )
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
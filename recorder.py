@@ -0,0 +1,57 @@
+import gzip
+import json
+import threading
+import time
+from typing import Iterator, Optional
+
+
+def open_log(path: str, mode: str):
+    """Открытие лога записи, сжатого gzip, если путь оканчивается на .gz."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class Recorder:
+    """Запись обращений к api Практикума и телеграму в лог json lines.
+
+    Без пути записи все вызовы record ничего не делают.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Инициализация записи в файл path."""
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, started: float, **payload) -> None:
+        """Запись события kind, начавшегося в started (time.monotonic)."""
+        if not self.path:
+            return
+        event = {
+            't': time.time(),
+            'kind': kind,
+            'duration': round(time.monotonic() - started, 6),
+            **payload,
+        }
+        line = json.dumps(event, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            if self._file is None:
+                self._file = open_log(self.path, 'a')
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self) -> None:
+        """Закрытие файла лога."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_log(path: str) -> Iterator[dict]:
+    """Чтение событий из лога записи."""
+    with open_log(path, 'r') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,160 @@
+import argparse
+import itertools
+import logging
+import time
+from http import HTTPStatus
+from typing import List
+
+from telegram.error import (BadRequest, NetworkError, RetryAfter, TimedOut,
+                            Unauthorized)
+
+import homework
+from exceptions import (ApiConnectionError, CycleDeadlineExceeded,
+                        RequestTimeout, ResponseObjNotJson, StatusCodeNot200)
+from recorder import Recorder, read_log
+from state import TenantStateStore
+
+
+class ReplayBot:
+    """Бот-заглушка, воспроизводящий записанные отправки.
+
+    Задержки берутся из лога по кругу, записанные сбои отправки
+    воспроизводятся той же ошибкой телеграма после задержки.
+    """
+
+    def __init__(self, calls: List[dict], speed: float):
+        """Инициализация бота записанными событиями telegram."""
+        self.speed = speed
+        self.sent = 0
+        self._calls = itertools.cycle(calls) if calls else None
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Имитация отправки сообщения без обращения к сети."""
+        if self._calls is not None:
+            call = next(self._calls)
+            time.sleep(call['duration'] / self.speed)
+            if call.get('error'):
+                raise replay_telegram_error(call)
+        self.sent += 1
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Перцентиль по ближайшему рангу."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = max(0, round(percent / 100 * len(values)) - 1)
+    return values[index]
+
+
+def replay_error(event: dict) -> Exception:
+    """Ошибка, которой завершился записанный запрос к api."""
+    errors = {
+        'RequestTimeout': lambda: RequestTimeout(homework.ENDPOINT),
+        'ApiConnectionError': lambda: ApiConnectionError(
+            homework.ENDPOINT, event['message']
+        ),
+        'CycleDeadlineExceeded': lambda: CycleDeadlineExceeded(
+            homework.ENDPOINT
+        ),
+    }
+    factory = errors.get(event['error'])
+    return factory() if factory else Exception(event['message'])
+
+
+def replay_telegram_error(event: dict) -> Exception:
+    """Ошибка, которой завершилась записанная отправка в телеграм."""
+    errors = {
+        'Unauthorized': lambda: Unauthorized(event['message']),
+        'BadRequest': lambda: BadRequest(event['message']),
+        'TimedOut': TimedOut,
+        'RequestTimeout': lambda: RequestTimeout(homework.TELEGRAM_ENDPOINT),
+        'RetryAfter': lambda: RetryAfter(event.get('retry_after') or 1),
+        'NetworkError': lambda: NetworkError(event['message']),
+    }
+    factory = errors.get(event['error'])
+    return factory() if factory else Exception(event['message'])
+
+
+def replay_cycle(bot: ReplayBot, event: dict) -> None:
+    """Прогон одного записанного ответа api через обработку бота."""
+    time.sleep(event['duration'] / bot.speed)
+    if event.get('error'):
+        raise replay_error(event)
+    if event['status_code'] != HTTPStatus.OK:
+        raise StatusCodeNot200(event['status_code'], homework.ENDPOINT)
+    if event['json'] is None:
+        raise ResponseObjNotJson()
+    homeworks = homework.check_response(event['json'])
+    homework.send_statuses(bot, homeworks)
+
+
+def replay(events: List[dict], speed: float = 1.0) -> dict:
+    """Воспроизведение лога с ускорением speed, возвращает статистику.
+
+    Воспроизведение начинается с пустого состояния в памяти.
+    """
+    tenant_states = homework.tenant_states
+    homework.tenant_states = TenantStateStore()
+    try:
+        return _replay(events, speed)
+    finally:
+        homework.tenant_states = tenant_states
+
+
+def _replay(events: List[dict], speed: float) -> dict:
+    api_events = [event for event in events if event['kind'] == 'api']
+    bot = ReplayBot(
+        [event for event in events if event['kind'] == 'telegram'], speed
+    )
+    latencies = []
+    errors = 0
+    started = time.monotonic()
+    first = api_events[0]['t'] - api_events[0]['duration'] if api_events else 0
+    for event in api_events:
+        offset = (event['t'] - event['duration'] - first) / speed
+        delay = offset - (time.monotonic() - started)
+        if delay > 0:
+            time.sleep(delay)
+        cycle_started = time.monotonic()
+        try:
+            replay_cycle(bot, event)
+        except Exception as error:
+            errors += 1
+            homework.logger.debug(f'Сбой при воспроизведении: {error}')
+        latencies.append(time.monotonic() - cycle_started)
+
+    wall_time = time.monotonic() - started
+    return {
+        'cycles': len(api_events),
+        'errors': errors,
+        'messages': bot.sent,
+        'wall_time': wall_time,
+        'messages_per_sec': bot.sent / wall_time if wall_time else 0.0,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p95': percentile(latencies, 95),
+        'latency_max': max(latencies, default=0.0),
+    }
+
+
+def main():
+    """Воспроизведение записанного трафика из командной строки."""
+    parser = argparse.ArgumentParser(
+        description='Воспроизведение записанного трафика бота без сети.'
+    )
+    parser.add_argument('log', help='файл, записанный через RECORD_FILE')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='ускорение воспроизведения (1 - реальное время)')
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error('--speed должен быть больше нуля')
+
+    homework.recorder = Recorder()
+    homework.logger.setLevel(logging.WARNING)
+    stats = replay(list(read_log(args.log)), args.speed)
+    for name, value in stats.items():
+        print(f'{name}: {value:.6g}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+
+class TimingWheel:
+    """Иерархическое колесо таймеров для планирования опросов.
+
+    Добавление и отмена дедлайна выполняются за O(1): каждый ключ
+    хранится в словаре-корзине своего уровня, а сами корзины
+    переносятся на нижние уровни только при повороте колеса.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 64, levels: int = 4,
+                 start: Optional[float] = None):
+        """Инициализация пустого колеса."""
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.start = time.monotonic() if start is None else start
+        self.current_tick = 0
+        self._wheels = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._ready = OrderedDict()
+        self._where = {}
+
+    def __len__(self) -> int:
+        """Количество запланированных опросов."""
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Запланирован ли опрос для key."""
+        return key in self._where
+
+    def _to_tick(self, moment: float) -> int:
+        return math.ceil((moment - self.start) / self.tick)
+
+    def _place(self, key: Hashable, deadline: float) -> None:
+        delta = self._to_tick(deadline) - self.current_tick
+        if delta <= 0:
+            bucket = self._ready
+        else:
+            level = 0
+            top = self.levels - 1
+            while level < top and delta >= self.slots ** (level + 1):
+                level += 1
+            target = self.current_tick + min(
+                delta, self.slots ** self.levels - 1
+            )
+            slot = (target // self.slots ** level) % self.slots
+            bucket = self._wheels[level][slot]
+        bucket[key] = deadline
+        self._where[key] = bucket
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Планирование опроса key на момент deadline (time.monotonic)."""
+        self.cancel(key)
+        self._place(key, deadline)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Отмена запланированного опроса, True если он был."""
+        bucket = self._where.pop(key, None)
+        if bucket is None:
+            return False
+        del bucket[key]
+        return True
+
+    def _cascade(self) -> None:
+        for level in range(1, self.levels):
+            if self.current_tick % self.slots ** level:
+                break
+            slot = (self.current_tick // self.slots ** level) % self.slots
+            bucket = self._wheels[level][slot]
+            self._wheels[level][slot] = {}
+            for key, deadline in bucket.items():
+                self._place(key, deadline)
+
+    def advance(self, now: float) -> None:
+        """Поворот колеса до момента now."""
+        now_tick = math.floor((now - self.start) / self.tick)
+        while self.current_tick < now_tick:
+            self.current_tick += 1
+            self._cascade()
+            slot = self.current_tick % self.slots
+            bucket = self._wheels[0][slot]
+            self._wheels[0][slot] = {}
+            for key, deadline in bucket.items():
+                self._ready[key] = deadline
+                self._where[key] = self._ready
+
+    def pop_due(self, now: float,
+                batch_size: int) -> List[Tuple[Hashable, float]]:
+        """Получение пачки наступивших опросов.
+
+        Возвращает пары (ключ, отклонение от дедлайна в секундах).
+        """
+        self.advance(now)
+        batch = []
+        while self._ready and len(batch) < batch_size:
+            key, deadline = self._ready.popitem(last=False)
+            del self._where[key]
+            batch.append((key, now - deadline))
+        return batch
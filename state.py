@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+import tracemalloc
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+class TenantStateStore:
+    """Состояние тенантов в памяти с ограничением объема.
+
+    Объем состояния тенанта считается по размеру его json. При превышении
+    max_bytes давно не использованные тенанты вытесняются в каталог
+    directory и загружаются обратно при следующем обращении. Без каталога
+    состояние не вытесняется, так как иначе оно было бы потеряно вместе с
+    меткой опроса, а превышение max_bytes видно только в отчете.
+
+    Все состояние тенантов, объем которого зависит от ответов api, нужно
+    хранить здесь. Остальные структуры с записью на тенанта регистрируются
+    через track: их размер в записях попадает в отчет о памяти.
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_bytes: int = 10 * 1024 * 1024):
+        """Инициализация хранилища."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._states = OrderedDict()
+        self._sizes = {}
+        self._dirty = set()
+        self._snapshot = None
+        self._own_tracing = False
+        self._tracked = {}
+        self._lock = threading.RLock()
+
+    def _path(self, tenant: Hashable) -> str:
+        return os.path.join(self.directory, f'{tenant}.json')
+
+    def _load(self, tenant: Hashable) -> dict:
+        if not self.directory:
+            return {}
+        try:
+            with open(self._path(tenant), encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, tenant: Hashable, state: dict) -> None:
+        if not self.directory or tenant not in self._dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(tenant)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(state, file, ensure_ascii=False)
+        os.replace(f'{path}.tmp', path)
+        self._dirty.discard(tenant)
+
+    def _resize(self, tenant: Hashable) -> None:
+        size = len(json.dumps(self._states[tenant], ensure_ascii=False))
+        self.total_bytes += size - self._sizes.get(tenant, 0)
+        self._sizes[tenant] = size
+        while (self.directory and self.total_bytes > self.max_bytes
+               and len(self._states) > 1):
+            cold, state = self._states.popitem(last=False)
+            self._write(cold, state)
+            self._dirty.discard(cold)
+            self.total_bytes -= self._sizes.pop(cold)
+
+    def get(self, tenant: Hashable) -> dict:
+        """Состояние тенанта, изменять его нужно только через update."""
+        with self._lock:
+            if tenant in self._states:
+                self._states.move_to_end(tenant)
+            else:
+                self._states[tenant] = self._load(tenant)
+                self._resize(tenant)
+            return self._states[tenant]
+
+    def update(self, tenant: Hashable, **fields) -> None:
+        """Обновление полей состояния тенанта."""
+        with self._lock:
+            self.get(tenant).update(fields)
+            self._dirty.add(tenant)
+            self._resize(tenant)
+
+    def persist(self, tenant: Hashable) -> None:
+        """Сохранение состояния тенанта на диск."""
+        with self._lock:
+            if tenant in self._states:
+                self._write(tenant, self._states[tenant])
+
+    def flush(self) -> None:
+        """Сохранение состояния всех тенантов на диск."""
+        with self._lock:
+            for tenant, state in self._states.items():
+                self._write(tenant, state)
+
+    def track(self, name: str, entries: Callable[[], int]) -> None:
+        """Регистрация структуры вне хранилища для отчета о памяти."""
+        with self._lock:
+            self._tracked[name] = entries
+
+    def memory_report(self, limit: int = 10, trace: bool = True) -> dict:
+        """Отчет о памяти: байты по тенантам и разница снимков tracemalloc.
+
+        Вызовы с trace чередуются: первый открывает окно отчета и включает
+        tracemalloc, второй сравнивает снимок с начальным и выключает
+        трассировку, чтобы она не замедляла процесс между отчетами.
+        """
+        with self._lock:
+            report = {
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'over_budget': self.total_bytes > self.max_bytes,
+                'tenants': dict(self._sizes),
+            }
+            tracked = dict(self._tracked)
+        report['entries'] = {name: entries() for name, entries in
+                             tracked.items()}
+        if not trace:
+            return report
+        if self._snapshot is None:
+            self._own_tracing = not tracemalloc.is_tracing()
+            if self._own_tracing:
+                tracemalloc.start()
+            self._snapshot = tracemalloc.take_snapshot()
+            report['tracemalloc'] = 'окно отчета открыто'
+            return report
+        snapshot = tracemalloc.take_snapshot()
+        report['tracemalloc'] = [
+            str(stat) for stat in
+            snapshot.compare_to(self._snapshot, 'lineno')[:limit]
+        ]
+        self._snapshot = None
+        if self._own_tracing:
+            tracemalloc.stop()
+        return report
@@ -0,0 +1,33 @@
+from http import HTTPStatus
+
+from exceptions import (FATAL, RATE_LIMITED, RETRYABLE, BotSendMessageError,
+                        RequestTimeout, StatusCodeNot200, TelegramTokenError,
+                        error_kind, retry_delay)
+
+
+class RetryAfter(Exception):
+    retry_after = 30
+
+
+class TestErrorTaxonomy:
+
+    def test_status_codes(self):
+        url = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+        assert StatusCodeNot200(HTTPStatus.TOO_MANY_REQUESTS,
+                                url).kind == RATE_LIMITED
+        assert StatusCodeNot200(HTTPStatus.BAD_GATEWAY, url).kind == RETRYABLE
+        assert StatusCodeNot200(HTTPStatus.REQUEST_TIMEOUT,
+                                url).kind == RETRYABLE
+        assert StatusCodeNot200(HTTPStatus.UNAUTHORIZED, url).kind == FATAL
+
+    def test_telegram_errors(self):
+        assert TelegramTokenError().kind == FATAL
+        error = BotSendMessageError(RetryAfter())
+        assert error.kind == RATE_LIMITED and error.retry_delay == 30
+        error = BotSendMessageError(RequestTimeout('https://api.telegram.org'))
+        assert error.kind == RETRYABLE
+
+    def test_unknown_errors(self):
+        assert error_kind(ValueError()) == RETRYABLE
+        assert retry_delay(ValueError(), 600) == 600
+        assert retry_delay(TelegramTokenError(), 600) == 600
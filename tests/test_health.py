@@ -0,0 +1,56 @@
+import json
+import urllib.error
+import urllib.request
+
+from health import HealthState, start_health_server
+
+
+class TestHealth:
+
+    def get(self, server, path):
+        url = f'http://127.0.0.1:{server.server_address[1]}{path}'
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read())
+
+    def test_endpoints(self):
+        state = HealthState(max_stall=60, max_poll_age=60)
+        server = start_health_server(state, 0, '127.0.0.1')
+        try:
+            state.poll_succeeded('chat')
+            status, report = self.get(server, '/ready')
+            assert status == 200
+            assert 'chat' in report['last_poll_age']
+            assert report['circuit'] == 'closed'
+
+            backlog = [1, 2]
+            state.track_queue('pipeline', lambda: len(backlog))
+            backlog.pop()
+            status, report = self.get(server, '/ready')
+            assert report['queue_depth'] == {'pipeline': 1}, (
+                'Глубина очереди должна браться в момент запроса'
+            )
+
+            state.heartbeat -= 120
+            status, report = self.get(server, '/health')
+            assert status == 503, (
+                'Зависший основной цикл должен давать ответ 503'
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_circuit_opens_after_failures(self):
+        state = HealthState(max_stall=60, max_poll_age=60,
+                            failure_threshold=2)
+        state.poll_failed()
+        state.poll_failed()
+        assert state.circuit == 'open'
+        state.poll_succeeded('chat')
+        assert state.circuit == 'open', (
+            'Успешный опрос api без доставки не закрывает цепь'
+        )
+        state.cycle_succeeded()
+        assert state.circuit == 'closed'
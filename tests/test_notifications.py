@@ -0,0 +1,161 @@
+import threading
+
+import pytest
+
+from notifications import (DIGEST_SEPARATOR, PRIORITY_ERROR, PRIORITY_STARTUP,
+                           PRIORITY_STATUS, OutboundQueue, build_digests,
+                           split_message, telegram_length)
+
+
+class TestDigests:
+
+    def test_single_message_unchanged(self):
+        assert build_digests(['Изменился статус']) == [('Изменился статус', 1)]
+
+    def test_messages_coalesced(self):
+        messages = ['a' * 10, 'b' * 10, 'c' * 10]
+        digests = build_digests(messages, limit=25)
+        assert digests == [
+            (DIGEST_SEPARATOR.join(messages[:2]), 2),
+            (messages[2], 1),
+        ]
+
+    def test_long_message_split(self):
+        digests = build_digests(['a' * 5, 'b' * 25], limit=10)
+        assert all(len(text) <= 10 for text, _ in digests), (
+            'Дайджест не должен превышать лимит телеграма'
+        )
+        assert ''.join(text for text, _ in digests).endswith('b' * 25)
+        assert sum(done for _, done in digests) == 2
+        assert digests[-1][1] == 1
+
+    def test_split_at_whitespace(self):
+        parts = split_message('первая строка\nвторое длинное', limit=16)
+        assert parts == ['первая строка', 'второе длинное'], (
+            'Сообщение должно делиться по строкам и словам'
+        )
+        assert split_message('слово ' * 3, limit=12) == ['слово слово', 'слово ']
+
+    def test_split_counts_utf16(self):
+        text = '😀' * 10
+        assert telegram_length(text) == 20
+        parts = split_message(text, limit=5)
+        assert all(telegram_length(part) <= 5 for part in parts), (
+            'Лимит телеграма считается в единицах UTF-16'
+        )
+        assert ''.join(parts) == text
+        digests = build_digests(['😀' * 3, '😀' * 3], limit=8)
+        assert all(telegram_length(text) <= 8 for text, _ in digests)
+
+
+class TestOutboundQueue:
+
+    def test_status_first(self):
+        outbox = OutboundQueue()
+        outbox.put('Бот запущен!', PRIORITY_STARTUP)
+        outbox.put('Сбой программы', PRIORITY_ERROR)
+        outbox.put('Изменился статус', PRIORITY_STATUS)
+        sent = []
+        assert outbox.flush(sent.append)
+        assert sent == ['Изменился статус', 'Сбой программы', 'Бот запущен!']
+
+    def test_errors_collapsed_and_shed(self):
+        outbox = OutboundQueue(max_backlog=2)
+        for _ in range(3):
+            outbox.put('Сбой программы: 500', PRIORITY_ERROR)
+        outbox.put('Сбой программы: 502', PRIORITY_ERROR)
+        assert not outbox.put('Сбой программы: 503', PRIORITY_ERROR)
+        assert outbox.put('Изменился статус', PRIORITY_STATUS), (
+            'Сообщения о статусах не должны отбрасываться'
+        )
+        sent = []
+        outbox.flush(sent.append)
+        assert sent == [
+            'Изменился статус',
+            'Сбой программы: 500 (повторов: 3)',
+            'Сбой программы: 502',
+        ]
+        assert outbox.shed == 1
+
+    def test_stale_expire(self):
+        outbox = OutboundQueue(ttl={PRIORITY_STARTUP: 0})
+        outbox.put('Бот запущен!', PRIORITY_STARTUP)
+        sent = []
+        outbox.flush(sent.append)
+        assert not sent
+
+    def test_failed_send_kept(self):
+        outbox = OutboundQueue()
+        delivered = []
+        outbox.put('a', PRIORITY_STATUS, on_sent=lambda: delivered.append(1))
+
+        def fail(text):
+            raise ConnectionError
+
+        with pytest.raises(ConnectionError):
+            outbox.flush(fail)
+        assert len(outbox) == 1 and not delivered
+        outbox.flush(lambda text: None)
+        assert delivered == [1]
+
+    def test_stop(self):
+        outbox = OutboundQueue()
+        outbox.put('a', PRIORITY_STATUS)
+        assert not outbox.flush(lambda text: None, stop=lambda: True)
+        assert len(outbox) == 1
+
+    def test_flush_up_to_priority(self):
+        outbox = OutboundQueue()
+        outbox.put('Сбой', PRIORITY_ERROR)
+        outbox.put('a', PRIORITY_STATUS)
+        sent = []
+        assert outbox.flush(sent.append, max_priority=PRIORITY_STATUS)
+        assert sent == ['a'] and len(outbox) == 1, (
+            'Сообщения с низшим приоритетом должны остаться в очереди'
+        )
+
+    def test_send_outside_lock(self):
+        outbox = OutboundQueue()
+        outbox.put('a', PRIORITY_STATUS)
+        outbox.put('b', PRIORITY_STATUS)
+        started, release = threading.Event(), threading.Event()
+        sent = []
+
+        def slow(text):
+            started.set()
+            release.wait(5)
+            sent.append(text)
+
+        worker = threading.Thread(target=outbox.flush, args=(slow,))
+        worker.start()
+        started.wait(5)
+        try:
+            assert outbox.put('Сбой', PRIORITY_ERROR)
+            assert outbox.flush(sent.append, max_priority=PRIORITY_STATUS)
+            assert sent == ['b'], (
+                'Отправка не должна блокировать другие потоки'
+            )
+        finally:
+            release.set()
+            worker.join(5)
+        assert sorted(sent) == ['a', 'b', 'Сбой']
+
+    def test_batches_isolated(self):
+        outbox = OutboundQueue()
+        first, second = object(), object()
+        outbox.put('a', PRIORITY_STATUS, batch=first)
+        outbox.put('Сбой', PRIORITY_ERROR)
+        outbox.put('b', PRIORITY_STATUS, batch=second)
+        sent = []
+        assert outbox.flush(sent.append, batch=first)
+        assert sent == ['a'], (
+            'Отправка пакета не должна трогать чужие сообщения'
+        )
+        outbox.put('c', PRIORITY_STATUS, batch=first)
+        assert outbox.drop(PRIORITY_STATUS, first) == 1
+        assert outbox.flush(sent.append, batch=second)
+        assert sent == ['a', 'b'], (
+            'Удаление пакета не должно удалять чужие дайджесты'
+        )
+        outbox.flush(sent.append)
+        assert sent == ['a', 'b', 'Сбой'] and not len(outbox)
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from pipeline import Pipeline
+
+
+class TestPipeline:
+
+    def test_fetch_overlaps_send(self):
+        sent = []
+        release = threading.Event()
+        fetched = []
+
+        def fetch(tenant):
+            fetched.append(tenant)
+            return tenant * 10
+
+        def send(tenant, result):
+            release.wait(5)
+            sent.append(result)
+
+        pipeline = Pipeline(fetch, send, on_error=None,
+                            fetch_workers=1, send_workers=1)
+        for tenant in range(3):
+            pipeline.submit(tenant)
+        deadline = time.monotonic() + 5
+        while len(fetched) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert fetched == [0, 1, 2], (
+            'Получение следующих тенантов не должно ждать отправки'
+        )
+        release.set()
+        assert pipeline.close(timeout=5)
+        assert sent == [0, 10, 20]
+
+    def test_errors_reported(self):
+        errors = []
+
+        def fetch(tenant):
+            raise ValueError(tenant)
+
+        pipeline = Pipeline(fetch, lambda *args: None,
+                            on_error=lambda tenant, error: errors.append(
+                                tenant),
+                            fetch_workers=2)
+        pipeline.submit('a')
+        pipeline.submit('b')
+        assert pipeline.close(timeout=5)
+        assert sorted(errors) == ['a', 'b']
+
+    def test_backpressure(self):
+        release = threading.Event()
+        pipeline = Pipeline(lambda tenant: release.wait(5),
+                            lambda *args: None, on_error=None,
+                            queue_size=1)
+        pipeline.submit(1)
+        pipeline.submit(2)
+        blocked = threading.Thread(target=pipeline.submit, args=(3,))
+        blocked.start()
+        blocked.join(0.2)
+        assert blocked.is_alive(), (
+            'Заполненная очередь должна блокировать постановку опроса'
+        )
+        release.set()
+        blocked.join(5)
+        assert pipeline.close(timeout=5)
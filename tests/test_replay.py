@@ -0,0 +1,87 @@
+import time
+
+import pytest
+import requests
+from telegram.error import TimedOut
+
+import homework
+import replay
+from exceptions import BotSendMessageError, RequestTimeout
+from recorder import Recorder, read_log
+
+
+class TestReplay:
+
+    def test_record_and_replay(self, tmp_path):
+        path = str(tmp_path / 'traffic.jsonl.gz')
+        recorder = Recorder(path)
+        homeworks = [
+            {'homework_name': 'hw1', 'status': 'approved'},
+            {'homework_name': 'hw2', 'status': 'rejected'},
+        ]
+        recorder.record('api', time.monotonic(), from_date=0,
+                        status_code=200,
+                        json={'homeworks': homeworks, 'current_date': 1})
+        recorder.record('telegram', time.monotonic(), chat_id=1, text='hw1')
+        recorder.record('api', time.monotonic(), from_date=1,
+                        status_code=500, json=None)
+        recorder.close()
+
+        events = list(read_log(path))
+        assert [event['kind'] for event in events] == [
+            'api', 'telegram', 'api'
+        ]
+        stats = replay.replay(events, speed=1000)
+        assert stats['cycles'] == 2
+        assert stats['errors'] == 1
+        assert stats['messages'] == 1, (
+            'Изменения статусов за цикл должны приходить одним дайджестом'
+        )
+
+    def test_disabled_recorder(self, tmp_path):
+        recorder = Recorder()
+        recorder.record('api', time.monotonic(), status_code=200)
+        assert not list(tmp_path.iterdir())
+
+    def test_failed_calls_recorded(self, monkeypatch, tmp_path):
+        def timeout(*args, **kwargs):
+            raise requests.ReadTimeout()
+
+        path = str(tmp_path / 'traffic.jsonl')
+        monkeypatch.setattr(homework, 'recorder', Recorder(path))
+        monkeypatch.setattr(homework.requests, 'get', timeout)
+        with pytest.raises(RequestTimeout):
+            homework.get_api_answer(1000198000)
+        homework.recorder.close()
+
+        events = list(read_log(path))
+        assert events[0]['error'] == 'RequestTimeout'
+        with pytest.raises(RequestTimeout):
+            replay.replay_cycle(replay.ReplayBot([], 1000), events[0])
+
+    def test_failed_send_recorded(self, monkeypatch, tmp_path):
+        class Bot:
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                raise TimedOut()
+
+        path = str(tmp_path / 'traffic.jsonl')
+        monkeypatch.setattr(homework, 'recorder', Recorder(path))
+        with pytest.raises(BotSendMessageError):
+            homework.send_message(Bot(), 'hw1')
+        homework.recorder.close()
+
+        events = list(read_log(path))
+        assert events[0]['error'] == 'TimedOut', (
+            'Сбой отправки должен отличаться в логе от успешной'
+        )
+        bot = replay.ReplayBot(events, 1000)
+        with pytest.raises(BotSendMessageError):
+            homework.send_message(bot, 'hw1')
+        assert bot.sent == 0
+
+    def test_state_restored(self):
+        tenant_states = homework.tenant_states
+        replay.replay([], speed=1000)
+        assert homework.tenant_states is tenant_states, (
+            'Воспроизведение не должно подменять состояние бота'
+        )
@@ -0,0 +1,252 @@
+import os
+import queue
+import signal
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+
+import homework
+from exceptions import StatusCodeNot200
+from notifications import PRIORITY_ERROR, OutboundQueue
+from scheduler import TimingWheel
+from state import TenantStateStore
+
+
+class TestRuntime:
+
+    @pytest.fixture(autouse=True)
+    def fresh_runtime(self, monkeypatch):
+        monkeypatch.setattr(homework, 'outbox', OutboundQueue())
+        monkeypatch.setattr(homework, 'retries', queue.Queue())
+        monkeypatch.setattr(homework, 'health', homework.HealthState(
+            max_stall=60, max_poll_age=60
+        ))
+        monkeypatch.setattr(homework, 'tenant_states', TenantStateStore())
+
+    def test_shutdown_interrupts_wait(self):
+        shutdown = homework.GracefulShutdown(timeout=0)
+        assert not shutdown.is_set()
+        shutdown.request()
+        assert shutdown.wait(60), (
+            'Ожидание должно прерываться при запросе остановки'
+        )
+        assert shutdown.drain_expired()
+
+    @pytest.mark.skipif(not hasattr(signal, 'SIGUSR2'),
+                        reason='нужны POSIX-сигналы')
+    def test_signal_during_wait(self):
+        shutdown = homework.GracefulShutdown(timeout=5)
+        previous = signal.signal(signal.SIGUSR2, shutdown.request)
+        sender = threading.Timer(
+            0.2, os.kill, args=(os.getpid(), signal.SIGUSR2)
+        )
+        started = time.monotonic()
+        sender.start()
+        try:
+            assert shutdown.wait(10), (
+                'Сигнал во время ожидания должен прерывать его'
+            )
+        finally:
+            sender.join()
+            signal.signal(signal.SIGUSR2, previous)
+        assert time.monotonic() - started < 2
+        assert shutdown.signum == signal.SIGUSR2
+        assert not shutdown.drain_expired()
+
+    def test_cursor_roundtrip(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(homework, 'tenant_states',
+                            TenantStateStore(str(tmp_path)))
+        homework.save_cursor(1000198000)
+        monkeypatch.setattr(homework, 'tenant_states',
+                            TenantStateStore(str(tmp_path)))
+        assert homework.load_cursor() == 1000198000
+
+    def test_cursor_missing(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(homework, 'tenant_states',
+                            TenantStateStore(str(tmp_path)))
+        assert homework.load_cursor() > 0
+
+    def test_bad_homework_quarantined(self, monkeypatch):
+        class Bot:
+            texts = []
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                self.texts.append(text)
+
+        monkeypatch.setattr(homework, 'tenant_states', TenantStateStore())
+        homeworks = [
+            {'homework_name': 'hw1', 'status': 'unknown'},
+            {'status': 'approved'},
+            None,
+            {'homework_name': 'hw2', 'status': 'approved'},
+        ]
+        bot = Bot()
+        assert homework.send_statuses(bot, homeworks)
+        assert len(bot.texts) == 1 and '"hw2"' in bot.texts[0], (
+            'Корректные работы должны обрабатываться несмотря на ошибки'
+        )
+        state = homework.tenant_states.get(homework.TELEGRAM_CHAT_ID)
+        assert len(state['quarantine']) == 3
+
+    def test_error_message_does_not_block_statuses(self, monkeypatch,
+                                                   tmp_path):
+        class Bot:
+            texts = []
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                if text.startswith('Сбой'):
+                    raise ConnectionError('telegram недоступен')
+                self.texts.append(text)
+
+        monkeypatch.setattr(homework, 'tenant_states',
+                            TenantStateStore(str(tmp_path)))
+        homework.outbox.put('Сбой программы: 502', PRIORITY_ERROR)
+        bot = Bot()
+        homeworks = [{'homework_name': 'hw1', 'status': 'approved'}]
+        assert homework.send_statuses(bot, homeworks), (
+            'Сбой отправки сообщения об ошибке не должен мешать статусам'
+        )
+        assert len(bot.texts) == 1 and len(homework.outbox) == 1
+
+    def test_run_once(self, monkeypatch, tmp_path):
+        class Response:
+            status_code = 200
+
+            def json(self):
+                return {
+                    'homeworks': [
+                        {'homework_name': 'hw1', 'status': 'approved'}
+                    ],
+                    'current_date': 1000198991,
+                }
+
+        class Bot:
+            texts = []
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                self.texts.append(text)
+
+        monkeypatch.setattr(homework.requests, 'get',
+                            lambda *args, **kwargs: Response())
+        monkeypatch.setattr(homework, 'tenant_states',
+                            TenantStateStore(str(tmp_path)))
+        bot = Bot()
+        assert homework.run_once(bot)
+        assert len(bot.texts) == 1
+        monkeypatch.setattr(homework, 'tenant_states',
+                            TenantStateStore(str(tmp_path)))
+        assert homework.load_cursor() == 1000198991, (
+            'Разовый опрос должен сохранять метку последнего опроса'
+        )
+
+    def test_run_once_failure(self, monkeypatch, tmp_path):
+        class Response:
+            status_code = HTTPStatus.BAD_GATEWAY
+
+        class Bot:
+            texts = []
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                self.texts.append(text)
+
+        monkeypatch.setattr(homework.requests, 'get',
+                            lambda *args, **kwargs: Response())
+        monkeypatch.setattr(homework, 'tenant_states',
+                            TenantStateStore(str(tmp_path)))
+        bot = Bot()
+        assert not homework.run_once(bot), (
+            'Разовый опрос со сбоем должен завершаться неудачей'
+        )
+        assert len(bot.texts) == 1 and 'Сбой' in bot.texts[0], (
+            'О сбое разового опроса нужно оповещать сразу'
+        )
+        assert homework.retries.empty()
+
+    def test_telegram_outage_retries_send(self, monkeypatch, tmp_path):
+        class Response:
+            status_code = 200
+
+            def json(self):
+                return {
+                    'homeworks': [
+                        {'homework_name': 'hw1', 'status': 'approved'}
+                    ],
+                    'current_date': 1000198991,
+                }
+
+        class Bot:
+            down = True
+            texts = []
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                if self.down:
+                    raise ConnectionError('telegram недоступен')
+                self.texts.append(text)
+
+        requests_made = []
+
+        def get(*args, **kwargs):
+            requests_made.append(1)
+            return Response()
+
+        monkeypatch.setattr(homework.requests, 'get', get)
+        monkeypatch.setattr(homework, 'tenant_states',
+                            TenantStateStore(str(tmp_path)))
+        tenant = homework.TELEGRAM_CHAT_ID
+        bot = Bot()
+        delays = []
+        for _ in range(5):
+            assert not homework.poll(bot, tenant)
+            _, delay, pending = homework.retries.get_nowait()
+            delays.append(delay)
+        assert homework.health.consecutive_failures == 5, (
+            'Сбои отправки должны накапливаться, хотя api отвечает'
+        )
+        assert delays == sorted(delays) and delays[0] < delays[-1], (
+            'Задержка повтора должна расти с числом сбоев подряд'
+        )
+        assert homework.health.circuit == 'open'
+        assert pending == (1000198991, Response().json()['homeworks'])
+
+        homework.retries.put((tenant, delay, pending))
+        homework.schedule_retries(TimingWheel())
+        bot.down = False
+        requests_made.clear()
+        homework.dispatch(bot, None, tenant)
+        assert not requests_made, (
+            'Повтор после сбоя телеграма не должен запрашивать api'
+        )
+        assert any('"hw1"' in text for text in bot.texts)
+        assert homework.health.consecutive_failures == 0
+        assert homework.load_cursor() == 1000198991
+
+    def test_run_due_drains_all_batches(self, monkeypatch):
+        dispatched = []
+        monkeypatch.setattr(homework, 'POLL_BATCH_SIZE', 10)
+        monkeypatch.setattr(
+            homework, 'dispatch',
+            lambda bot, pipeline, tenant: dispatched.append(tenant)
+        )
+        wheel = TimingWheel(tick=0.01)
+        for tenant in range(25):
+            wheel.schedule(tenant, time.monotonic() - 1)
+        homework.run_due(None, None, wheel)
+        assert sorted(dispatched) == list(range(25)), (
+            'Все наступившие опросы должны запускаться без ожидания тика'
+        )
+        lateness = homework.health.report()['schedule_lateness']
+        assert lateness['max'] >= 1
+
+    def test_next_retry(self):
+        url = homework.ENDPOINT
+        transient = StatusCodeNot200(HTTPStatus.BAD_GATEWAY, url)
+        assert homework.next_retry(transient, 1) < 60, (
+            'Временные сбои должны повторяться через секунды'
+        )
+        assert (homework.next_retry(transient, 2)
+                > homework.next_retry(transient, 1))
+        assert homework.next_retry(transient, 100) == homework.RETRY_TIME
+        fatal = StatusCodeNot200(HTTPStatus.UNAUTHORIZED, url)
+        assert homework.next_retry(fatal, 1) == homework.FATAL_RETRY_TIME
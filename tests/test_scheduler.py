@@ -0,0 +1,47 @@
+import random
+
+from scheduler import TimingWheel
+
+
+class TestTimingWheel:
+
+    def test_fires_not_before_deadline(self):
+        wheel = TimingWheel(tick=1, slots=4, levels=3, start=0)
+        deadlines = {key: random.uniform(0, 200) for key in range(300)}
+        for key, deadline in deadlines.items():
+            wheel.schedule(key, deadline)
+
+        fired = {}
+        for now in range(0, 202):
+            for key, lateness in wheel.pop_due(now, batch_size=1000):
+                fired[key] = lateness
+        assert fired.keys() == deadlines.keys(), (
+            'Все запланированные опросы должны сработать'
+        )
+        assert all(0 <= lateness < 1 for lateness in fired.values()), (
+            'Опрос должен срабатывать не раньше дедлайна и не позже тика'
+        )
+        assert not len(wheel)
+
+    def test_cancel_and_reschedule(self):
+        wheel = TimingWheel(tick=1, start=0)
+        wheel.schedule('a', 10)
+        wheel.schedule('b', 10)
+        assert wheel.cancel('a')
+        assert not wheel.cancel('a')
+        wheel.schedule('b', 500)
+        assert wheel.pop_due(20, batch_size=10) == []
+        assert [key for key, _ in wheel.pop_due(500, batch_size=10)] == ['b']
+
+    def test_batches(self):
+        wheel = TimingWheel(tick=1, start=0)
+        for key in range(5):
+            wheel.schedule(key, 0)
+        assert len(wheel.pop_due(1, batch_size=2)) == 2
+        assert len(wheel.pop_due(1, batch_size=10)) == 3
+
+    def test_beyond_top_level(self):
+        wheel = TimingWheel(tick=1, slots=2, levels=2, start=0)
+        wheel.schedule('far', 25)
+        due = [wheel.pop_due(now, 10) for now in range(30)]
+        assert [i for i, batch in enumerate(due) if batch] == [25]
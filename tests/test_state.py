@@ -0,0 +1,55 @@
+import tracemalloc
+
+from state import TenantStateStore
+
+
+class TestTenantStateStore:
+
+    def test_lru_eviction_to_disk(self, tmp_path):
+        store = TenantStateStore(str(tmp_path), max_bytes=100)
+        for tenant in range(5):
+            store.update(tenant, current_date=tenant, payload='x' * 20)
+        assert store.total_bytes <= 100
+        assert 0 not in store.memory_report(trace=False)['tenants'], (
+            'Давно не использованный тенант должен быть вытеснен'
+        )
+        assert store.get(0) == {'current_date': 0, 'payload': 'x' * 20}, (
+            'Вытесненное состояние должно загружаться с диска'
+        )
+
+    def test_recently_used_kept(self, tmp_path):
+        store = TenantStateStore(str(tmp_path), max_bytes=100)
+        store.update('a', payload='x' * 20)
+        store.update('b', payload='x' * 20)
+        store.get('a')
+        store.update('c', payload='x' * 40)
+        tenants = store.memory_report(trace=False)['tenants']
+        assert 'a' in tenants and 'b' not in tenants
+
+    def test_no_eviction_without_directory(self):
+        store = TenantStateStore(max_bytes=10)
+        store.update('a', current_date=1, payload='x' * 20)
+        store.update('b', payload='x' * 20)
+        report = store.memory_report(trace=False)
+        assert store.get('a') == {'current_date': 1, 'payload': 'x' * 20}, (
+            'Без каталога вытеснение потеряло бы состояние'
+        )
+        assert report['over_budget']
+
+    def test_tracked_entries_reported(self):
+        store = TenantStateStore()
+        outbox = [1, 2, 3]
+        store.track('outbox', lambda: len(outbox))
+        assert store.memory_report(trace=False)['entries'] == {'outbox': 3}
+
+    def test_memory_report_diff(self):
+        store = TenantStateStore()
+        assert 'tracemalloc' not in store.memory_report(trace=False)
+        assert not tracemalloc.is_tracing()
+        assert isinstance(store.memory_report()['tracemalloc'], str)
+        assert tracemalloc.is_tracing()
+        store.update('a', payload='x')
+        assert isinstance(store.memory_report()['tracemalloc'], list)
+        assert not tracemalloc.is_tracing(), (
+            'После отчета трассировка памяти должна выключаться'
+        )
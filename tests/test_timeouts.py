@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from exceptions import CycleDeadlineExceeded, RequestTimeout
+import timeouts
+from timeouts import Deadline, call_with_timeout, current_deadline
+
+
+class TestTimeouts:
+
+    def test_total_timeout(self):
+        release = threading.Event()
+        started = time.monotonic()
+        with pytest.raises(RequestTimeout):
+            call_with_timeout('https://example.com', 0.1, release.wait, 5)
+        release.set()
+        assert time.monotonic() - started < 1, (
+            'Зависший вызов должен прерываться по общему таймауту'
+        )
+
+    def test_cycle_budget_limits_call(self):
+        release = threading.Event()
+        with Deadline(0.1):
+            with pytest.raises(RequestTimeout):
+                call_with_timeout('https://example.com', 60, release.wait, 5)
+        release.set()
+
+    def test_expired_budget_skips_call(self):
+        calls = []
+        with Deadline(0):
+            with pytest.raises(CycleDeadlineExceeded):
+                call_with_timeout('https://example.com', 60, calls.append, 1)
+        assert not calls
+
+    def test_deadline_scope(self):
+        assert current_deadline() is None
+        with Deadline(10) as deadline:
+            assert current_deadline() is deadline
+            assert 0 < deadline.remaining() <= 10
+        assert current_deadline() is None
+
+    def test_stop_interrupts_running_call(self):
+        release = threading.Event()
+        stopper = threading.Timer(
+            0.1, timeouts.stop_at, args=(time.monotonic() + 0.2,)
+        )
+        stopper.start()
+        started = time.monotonic()
+        try:
+            with pytest.raises(RequestTimeout):
+                call_with_timeout('https://example.com', 60, release.wait, 5)
+        finally:
+            timeouts.stop_at(None)
+            release.set()
+        assert time.monotonic() - started < 2, (
+            'Идущий вызов должен прерываться по дедлайну остановки'
+        )
+
+    def test_abandoned_calls_do_not_block(self):
+        release = threading.Event()
+        for _ in range(50):
+            with pytest.raises(RequestTimeout):
+                call_with_timeout('https://example.com', 0.01,
+                                  release.wait, 5)
+        started = time.monotonic()
+        thread = call_with_timeout('https://example.com', 1,
+                                   threading.current_thread)
+        release.set()
+        assert time.monotonic() - started < 0.5, (
+            'Брошенные вызовы не должны задерживать новые'
+        )
+        assert thread.daemon, (
+            'Вызов не должен мешать завершению процесса'
+        )
+
+    def test_stop_passed_skips_call(self):
+        calls = []
+        timeouts.stop_at(time.monotonic() - 1)
+        try:
+            with pytest.raises(RequestTimeout):
+                call_with_timeout('https://example.com', 60, calls.append, 1)
+        finally:
+            timeouts.stop_at(None)
+        time.sleep(0.05)
+        assert not calls, (
+            'После дедлайна остановки новые вызовы не должны начинаться'
+        )
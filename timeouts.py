@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent import futures
+from typing import Callable, Optional
+
+from exceptions import CycleDeadlineExceeded, RequestTimeout
+
+_local = threading.local()
+_stop = {'deadline': None}
+STOP_CHECK_INTERVAL: float = 0.5
+
+
+class Deadline:
+    """Бюджет времени на цикл опроса.
+
+    Внутри блока with дедлайн становится текущим для потока и
+    ограничивает время сетевых вызовов через call_with_timeout.
+    """
+
+    def __init__(self, budget: float):
+        """Инициализация дедлайна через budget секунд."""
+        self.expires = time.monotonic() + budget
+        self._previous = None
+
+    def remaining(self) -> float:
+        """Оставшееся время в секундах."""
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self) -> bool:
+        """Исчерпан ли бюджет времени."""
+        return time.monotonic() >= self.expires
+
+    def __enter__(self):
+        """Установка дедлайна текущим для потока."""
+        self._previous = getattr(_local, 'deadline', None)
+        _local.deadline = self
+        return self
+
+    def __exit__(self, *exc_info):
+        """Восстановление предыдущего дедлайна потока."""
+        _local.deadline = self._previous
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Дедлайн текущего цикла опроса в этом потоке."""
+    return getattr(_local, 'deadline', None)
+
+
+def stop_at(deadline: Optional[float]) -> None:
+    """Ограничение всех, в том числе уже идущих, вызовов моментом deadline.
+
+    Только присваивает значение, поэтому безопасна в обработчике сигнала.
+    """
+    _stop['deadline'] = deadline
+
+
+def _run(future: futures.Future, func: Callable, args, kwargs) -> None:
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        future.set_result(func(*args, **kwargs))
+    except BaseException as error:
+        future.set_exception(error)
+
+
+def call_with_timeout(endpoint: str, total: float, func: Callable,
+                      *args, **kwargs):
+    """Вызов func не дольше total секунд и остатка бюджета цикла.
+
+    Ожидание также прерывается по дедлайну остановки из stop_at, даже если
+    он был установлен уже во время вызова. Каждый вызов идет в отдельном
+    daemon-потоке: брошенный по таймауту вызов не занимает место в пуле
+    и не задерживает завершение процесса.
+    """
+    deadline = current_deadline()
+    if deadline is not None:
+        if deadline.expired():
+            raise CycleDeadlineExceeded(endpoint)
+        total = min(total, deadline.remaining())
+    end = time.monotonic() + total
+    stop = _stop['deadline']
+    if stop is not None and stop <= time.monotonic():
+        raise RequestTimeout(endpoint, 0.0)
+    future = futures.Future()
+    threading.Thread(
+        target=_run, args=(future, func, args, kwargs),
+        name=f'timeout-{endpoint}', daemon=True,
+    ).start()
+    while True:
+        stop = _stop['deadline']
+        limit = end if stop is None else min(end, stop)
+        remaining = limit - time.monotonic()
+        if remaining <= 0:
+            future.cancel()
+            raise RequestTimeout(endpoint, total)
+        try:
+            return future.result(min(remaining, STOP_CHECK_INTERVAL))
+        except futures.TimeoutError:
+            if future.done():
+                raise